@@ -6,43 +6,76 @@ Writes a single Excel file (aria_members.xlsx) with columns:
 type, name, company, mobile_no, email, website
 
 Requirements:
-    pip install selenium webdriver-manager beautifulsoup4 pandas openpyxl
+    pip install selenium webdriver-manager lxml openpyxl
 
 Usage:
     Close aria_members.xlsx if it's open in Excel, then run:
     python aria_members_final_v2.py
+
+    To reuse one browser across runs/scripts, start Chrome once with
+        chrome --remote-debugging-port=9222 --user-data-dir=/tmp/chrome-scrape
+    and set DEBUG_PORT = 9222.
 """
 
-import time, re, os
+import re, os
 from pathlib import Path
+import queue, threading
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
-from openpyxl import load_workbook
+from lxml import etree
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 
 START_URL = "https://aria.org.in/members-directory/"
 OUT_XLSX = Path("aria_members.xlsx")
 HEADLESS = False
-PAGE_WAIT = 1.2
-CLICK_WAIT = 0.5
+DEBUG_PORT = None     # e.g. 9222 to attach to a Chrome started with --remote-debugging-port
+NAV_TIMEOUT = 5       # max wait for cards to appear / change after a navigation
+COLUMNS = ["type","name","company","mobile_no","email","website"]
+
+# keep only digits for dedupe keys (any Unicode non-digit, e.g. U+2011 non-breaking hyphen)
+_NONDIGIT_SUB = re.compile(r"\D").sub
+
+# lxml's libxml2 HTML parser directly (no bs4 / html.parser fallback); only the
+# single parser thread uses it, so sharing one instance is safe
+_HTML_PARSER = etree.HTMLParser(recover=True, remove_comments=True)
 
-EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
-PHONE_RE = re.compile(r'(\+\d{1,3}[\s\-\.]?)?(\d{10,12})')
-HTTP_RE = re.compile(r'https?://[^\s"\']+')
+# precompiled XPath for the cards and their fields (evaluated relative to a card / li)
+# (smart_strings=False so results are plain str and don't keep the tree alive)
+CARDS_XPATH = etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' member-card ')]")
+CATEGORY = etree.XPath("normalize-space(.//*[contains(concat(' ', normalize-space(@class), ' '), ' membercategory ')])", smart_strings=False)
+ITEM_TITLE = etree.XPath("normalize-space(.//*[contains(concat(' ', normalize-space(@class), ' '), ' itemtitle ')])", smart_strings=False)
+LI_XPATH = etree.XPath(
+    ".//ul[contains(concat(' ', normalize-space(@class), ' '), ' member-listgroup ')]"
+    "/li[contains(concat(' ', normalize-space(@class), ' '), ' member-listgroup-item ')]"
+)
+ICON_CLASS = etree.XPath("string(.//i/@class)", smart_strings=False)
+TITLE = etree.XPath("normalize-space(.//h6[contains(concat(' ', normalize-space(@class), ' '), ' title ')])", smart_strings=False)
+MAILTO = etree.XPath("normalize-space(.//a[starts-with(@href,'mailto:')])", smart_strings=False)
+LINK = etree.XPath("string(.//a[starts-with(@href,'http')]/@href)", smart_strings=False)
 
-def setup_driver(headless=True):
+def setup_driver(headless=True, debug_port=None):
     options = webdriver.ChromeOptions()
-    if headless:
-        options.add_argument("--headless=new")
-    options.add_argument("--window-size=1600,1000")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-    options.add_experimental_option("excludeSwitches", ["enable-automation","enable-logging"])
-    service = Service(ChromeDriverManager().install(), log_path="chromedriver.log")
-    driver = webdriver.Chrome(service=service, options=options)
+    if debug_port:
+        # attach to an already running Chrome instead of launching one; launch
+        # options (headless, prefs, switches) are fixed by whoever started it
+        options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
+        driver = webdriver.Chrome(options=options)
+    else:
+        if headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--window-size=1600,1000")
+        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
+        options.add_experimental_option("excludeSwitches", ["enable-automation","enable-logging"])
+        # images aren't scraped, skip loading them
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        service = Service(ChromeDriverManager().install(), log_path="chromedriver.log")
+        driver = webdriver.Chrome(service=service, options=options)
     try:
         driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
             "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
@@ -53,12 +86,12 @@ def setup_driver(headless=True):
 
 def discover_max_page(driver):
     # look for any anchors with data-page attribute and numeric text
-    nodes = driver.find_elements(By.CSS_SELECTOR, "a.page-link[data-page]")
-    pages = []
-    for n in nodes:
-        dp = n.get_attribute("data-page")
-        if dp and dp.isdigit():
-            pages.append(int(dp))
+    # (read all data-page values in one script call rather than one get_attribute per link)
+    values = driver.execute_script(
+        "return Array.from(document.querySelectorAll('a.page-link[data-page]'))"
+        ".map(function (a) { return a.getAttribute('data-page'); });"
+    ) or []
+    pages = [int(dp) for dp in values if dp and dp.isdigit()]
     if pages:
         return max(pages)
     # fallback: try to parse last li >> a text
@@ -72,102 +105,113 @@ def discover_max_page(driver):
     # last resort: assume 14 (from earlier)
     return 14
 
-def collect_pages_by_click(driver, start_url):
+def click_page(driver, p):
+    """
+    JS-click the pagination link for page p and wait until the current cards are replaced.
+    Returns False if the link is not on the page.
+    """
+    old_cards = driver.find_elements(By.CSS_SELECTOR, "div.card.member-card")[:1]
+    clicked = driver.execute_script(
+        "var e = document.querySelector(\"a.page-link[data-page='%d']\"); if (e) { e.click(); return true; } return false;" % p
+    )
+    if not clicked:
+        return False
+    try:
+        wait = WebDriverWait(driver, NAV_TIMEOUT)
+        if old_cards:
+            wait.until(EC.staleness_of(old_cards[0]))
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.card.member-card")))
+    except TimeoutException:
+        print(f"Warning: page {p} did not replace its cards within {NAV_TIMEOUT}s; using current DOM.")
+    return True
+
+def cards_html(driver):
+    """
+    Return only the member cards' outerHTML for the current page. The full
+    page_source is several hundred KB, most of it markup we never read.
+    """
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll('div.card.member-card'))"
+        ".map(function (e) { return e.outerHTML; }).join('');"
+    ) or ""
+
+def collect_pages_by_click(driver, start_url, page_queue):
+    """Navigate every page and hand each page's card markup to page_queue as soon as it loads."""
     driver.get(start_url)
-    time.sleep(PAGE_WAIT)
+    try:
+        WebDriverWait(driver, NAV_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.card.member-card")))
+    except TimeoutException:
+        print(f"Warning: no member cards after {NAV_TIMEOUT}s on the start page; continuing.")
     max_page = discover_max_page(driver)
     print("Detected max page:", max_page)
 
-    pages_html = []
+    collected = 0
     for p in range(1, max_page+1):
         # if p == 1 we already loaded it
         if p == 1:
             print("Collecting page 1")
-            pages_html.append(driver.page_source)
+            page_queue.put(cards_html(driver))
+            collected += 1
             continue
-        # attempt to find element with data-page == p and click it
         print(f"Navigating to page {p} ...")
-        tried = False
         try:
-            # first try inside pagination container if present
-            el = driver.find_element(By.CSS_SELECTOR, f"a.page-link[data-page='{p}']")
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-            time.sleep(0.12)
-            try:
-                el.click()
-            except (ElementClickInterceptedException, StaleElementReferenceException):
-                driver.execute_script("arguments[0].click();", el)
-            time.sleep(PAGE_WAIT + CLICK_WAIT)
-            pages_html.append(driver.page_source)
-            tried = True
-        except Exception as e:
-            # fallback: try clicking by text (rare) or using JS to trigger the click
-            try:
-                driver.execute_script(
-                    "var e = document.querySelector(\"a.page-link[data-page='%d']\"); if(e) e.click();" % p
-                )
-                time.sleep(PAGE_WAIT + CLICK_WAIT)
-                pages_html.append(driver.page_source)
-                tried = True
-            except Exception:
-                tried = False
-        if not tried:
+            html = cards_html(driver) if click_page(driver, p) else None
+        except Exception:
+            html = None
+        if html is not None:
+            page_queue.put(html)
+            collected += 1
+        else:
             print(f"Warning: Could not navigate to page {p}. Continuing.")
-    print(f"Collected {len(pages_html)} pages (requested 1..{max_page}).")
-    return pages_html
+    print(f"Collected {collected} pages (requested 1..{max_page}).")
+    return collected
+
+def parse_pages_worker(page_queue, out):
+    """Consume page HTML from page_queue until a None sentinel, extending out with parsed members."""
+    i = 0
+    while True:
+        html = page_queue.get()
+        if html is None:
+            break
+        i += 1
+        try:
+            members = parse_cards_from_html(html)
+        except Exception as e:
+            # keep draining the queue so the producer never blocks on a full queue
+            print(f"Warning: Could not parse page {i}: {e}")
+            continue
+        print(f"Parsed page {i}: {len(members)} cards found")
+        out.extend(members)
 
 def parse_cards_from_html(html):
-    soup = BeautifulSoup(html, "lxml")
-    cards = soup.select("div.card.member-card")
+    if not html:
+        return []
+    # html is just the cards' outerHTML (see cards_html); fromstring returns
+    # None when that is only whitespace/comments
+    root = etree.fromstring(html, _HTML_PARSER)
+    if root is None:
+        return []
     members = []
-    for card in cards:
-        typ = (card.select_one(".membercategory").get_text(strip=True) if card.select_one(".membercategory") else "").strip()
-        name = (card.select_one(".itemtitle").get_text(strip=True) if card.select_one(".itemtitle") else "").strip()
-
-        # company
-        company = ""
-        for li in card.select("ul.member-listgroup li.member-listgroup-item"):
-            icon = li.select_one("i")
-            if icon and "bi-briefcase" in " ".join(icon.get("class") or []):
-                h = li.select_one("h6.title")
-                if h:
-                    company = h.get_text(strip=True)
-                break
+    for card in CARDS_XPATH(root):
+        typ = CATEGORY(card)
+        name = ITEM_TITLE(card)
 
-        # phone
-        phone = ""
-        for li in card.select("ul.member-listgroup li.member-listgroup-item"):
-            icon = li.select_one("i")
-            if icon and "bi-phone" in " ".join(icon.get("class") or []):
-                h = li.select_one("h6.title")
-                if h:
-                    phone = h.get_text(strip=True)
-                break
-        phone = re.sub(r'\s+','', phone)  # remove internal spaces but preserve leading +
-
-        # email
-        email = ""
-        for li in card.select("ul.member-listgroup li.member-listgroup-item"):
-            icon = li.select_one("i")
-            if icon and "bi-envelope" in " ".join(icon.get("class") or []):
-                a = li.select_one("a[href^='mailto:']")
-                if a:
-                    email = a.get_text(strip=True)
-                else:
-                    h = li.select_one("h6.title")
-                    if h:
-                        email = h.get_text(strip=True)
-                break
-
-        # website
-        website = ""
-        for li in card.select("ul.member-listgroup li.member-listgroup-item"):
-            icon = li.select_one("i")
-            if icon and "bi-globe2" in " ".join(icon.get("class") or []):
-                a = li.select_one("a[href^='http']")
-                if a:
-                    website = a.get("href").strip()
+        # single pass over the list items, dispatching on the icon class;
+        # the first item per field wins and we stop once all four are filled
+        company = phone = email = website = ""
+        for li in LI_XPATH(card):
+            cls = ICON_CLASS(li).split()  # class tokens, matched exactly below
+            if "bi-briefcase" in cls:
+                company = company or TITLE(li)
+            elif "bi-phone" in cls:
+                phone = phone or TITLE(li)
+            elif "bi-envelope" in cls:
+                email = email or MAILTO(li) or TITLE(li)
+            elif "bi-globe2" in cls:
+                website = website or LINK(li).strip()
+            if company and phone and email and website:
                 break
+        phone = "".join(phone.split())  # remove internal (Unicode) spaces but preserve leading +
 
         members.append({
             "type": typ,
@@ -180,8 +224,6 @@ def parse_cards_from_html(html):
     return members
 
 def write_xlsx_only(members, out_xlsx=OUT_XLSX):
-    # create dataframe and try to overwrite existing XLSX
-    df = pd.DataFrame(members, columns=["type","name","company","mobile_no","email","website"])
     # attempt to remove existing file if present (if open in Excel, this will raise)
     if out_xlsx.exists():
         try:
@@ -191,47 +233,36 @@ def write_xlsx_only(members, out_xlsx=OUT_XLSX):
             print("Please close the file and re-run the script.")
             return False
 
-    # write excel
-    df.to_excel(out_xlsx, index=False, engine="openpyxl")
-    # enforce Text format for mobile_no column
-    wb = load_workbook(out_xlsx)
-    ws = wb.active
-    mobile_col_idx = None
-    for idx, cell in enumerate(ws[1], start=1):
-        if (cell.value or "").strip().lower() == "mobile_no":
-            mobile_col_idx = idx
-            break
-    if mobile_col_idx:
-        for r in range(1, ws.max_row+1):
-            c = ws.cell(row=r, column=mobile_col_idx)
-            c.number_format = '@'
-            if c.value is None:
-                continue
-            if not isinstance(c.value, str):
-                c.value = str(c.value)
+    # stream rows in a single pass; mobile_no is written as Text so Excel keeps leading + / zeros
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(COLUMNS)
+    for m in members:
+        mobile = WriteOnlyCell(ws, value=str(m["mobile_no"]))
+        mobile.number_format = '@'
+        ws.append([mobile if c == "mobile_no" else m[c] for c in COLUMNS])
     wb.save(out_xlsx)
-    print(f"Wrote XLSX -> {out_xlsx} ({len(df)} rows).")
+    print(f"Wrote XLSX -> {out_xlsx} ({len(members)} rows).")
     return True
 
 def main():
-    driver = setup_driver(headless=HEADLESS)
+    driver = setup_driver(headless=HEADLESS, debug_port=DEBUG_PORT)
     try:
-        pages = collect_pages_by_click(driver, START_URL)
+        # parse on a background thread while the driver keeps clicking through pages
         all_members = []
-        for i, html in enumerate(pages, start=1):
-            print(f"Parsing page {i} ...")
-            members = parse_cards_from_html(html)
-            print(f" -> {len(members)} cards found")
-            all_members.extend(members)
-        # dedupe
-        seen = set()
-        dedup = []
-        for m in all_members:
-            key = (m.get("email","").lower(), re.sub(r'\D','', m.get("mobile_no","")), (m.get("name","") or "").lower())
-            if key in seen:
-                continue
-            seen.add(key)
-            dedup.append(m)
+        page_queue = queue.Queue(maxsize=4)
+        parser = threading.Thread(target=parse_pages_worker, args=(page_queue, all_members), daemon=True)
+        parser.start()
+        try:
+            collect_pages_by_click(driver, START_URL, page_queue)
+        finally:
+            page_queue.put(None)
+            parser.join()
+        # dedupe on (email, phone digits, name); keeps first-seen order, later duplicates win
+        dedup = list({
+            (m["email"].lower(), _NONDIGIT_SUB("", m["mobile_no"]), m["name"].lower()): m
+            for m in all_members
+        }.values())
         print(f"Unique members collected: {len(dedup)}")
         ok = write_xlsx_only(dedup)
         if not ok:
@@ -9,7 +9,7 @@ Fixes:
  - Waits until pagination_inner shows expected range for each page before scraping
 
 Requirements:
-  pip install selenium webdriver-manager pandas openpyxl
+  pip install selenium webdriver-manager pandas xlsxwriter
 """
 
 from selenium import webdriver
@@ -18,9 +18,9 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
-import time
 import traceback
 import math
 import re
@@ -29,8 +29,9 @@ import re
 START_URL = "https://www.sebi.gov.in/sebiweb/other/OtherAction.do?doRecognisedFpi=yes&intmId=13"
 OUTPUT_XLSX = "sebi_fpi_list_all_pages_corrected.xlsx"
 HEADLESS = False          # set True for headless runs
-CLICK_DELAY = 0.8         # wait after triggering a change
 WAIT_TIMEOUT = 15         # wait for elements to appear
+RESULTS_WAIT = 2          # max wait for a letter's results to visibly refresh
+DEBUG_PORT = None         # e.g. 9222 to attach to a Chrome started with --remote-debugging-port
 # ----------------------------
 
 COLUMNS = [
@@ -62,8 +63,27 @@ TITLE_TO_HEADER = {
     "Registration No": "Registration No.",
 }
 
-def make_driver(headless=True):
+# "1 to 25 of 136 records" -> (start, end, total); polled during page waits
+_PAG_RE = re.compile(r"(\d+)\s*to\s*(\d+)\s*of\s*(\d+)", re.IGNORECASE)
+_NBSP_TO_SPACE = {0xa0: 0x20}
+
+# evaluated through CDP Runtime.evaluate, so this is an expression, not a function body
+CARDS_JS = """
+Array.from(document.querySelectorAll('div.fixed-table-body.card-table')).map(function (card) {
+    return Array.from(card.querySelectorAll('div.card-view')).map(function (cv) {
+        var t = cv.querySelector('div.title span');
+        var v = cv.querySelector('div.value span');
+        return (t && v) ? [t.innerText.trim(), v.innerText.trim()] : null;
+    });
+})
+"""
+
+def make_driver(headless=True, debug_port=None):
     chrome_options = Options()
+    if debug_port:
+        # attach to an already running Chrome (started with --remote-debugging-port)
+        chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
+        return webdriver.Chrome(options=chrome_options)
     if headless:
         chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
@@ -73,6 +93,8 @@ def make_driver(headless=True):
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
     )
+    # images aren't scraped, skip loading them
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
@@ -83,6 +105,19 @@ def call_js_safe(driver, script):
     except Exception:
         return None
 
+def evaluate_js(driver, expression):
+    """
+    Evaluate a JS expression over CDP and return its JSON value (None on error).
+    Skips WebDriver's element wrapping/unwrapping of execute_script results.
+    """
+    try:
+        res = driver.execute_cdp_cmd("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+    except Exception:
+        return None
+    if res.get("exceptionDetails"):
+        return None
+    return res.get("result", {}).get("value")
+
 def trigger_letter(driver, letter_id):
     js = f"if (typeof searchFormFpiAlp === 'function') {{ searchFormFpiAlp('{letter_id}'); return true; }} else {{ return false; }}"
     res = call_js_safe(driver, js)
@@ -104,13 +139,18 @@ def trigger_page_zero_based(driver, page_zero_based):
     if res:
         return True
     # fallback: attempt to click anchor with the matching javascript href (best-effort)
+    # (hrefs are read in one script call rather than one get_attribute per anchor)
     try:
-        anchors = driver.find_elements(By.CSS_SELECTOR, "div.pagination_outer ul li a")
-        for a in anchors:
-            href = a.get_attribute("href") or ""
+        hrefs = driver.execute_script(
+            "return Array.from(document.querySelectorAll('div.pagination_outer ul li a'))"
+            ".map(function (a) { return a.href || ''; });"
+        ) or []
+        for i, href in enumerate(hrefs):
             if f"searchFormFpi('n', '{page_zero_based}')" in href or f"searchFormFpi(\"n\", \"{page_zero_based}\")" in href:
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", a)
-                driver.execute_script("arguments[0].click();", a)
+                driver.execute_script(
+                    "var a = document.querySelectorAll('div.pagination_outer ul li a')[arguments[0]];"
+                    "a.scrollIntoView({block:'center'}); a.click();", i
+                )
                 return True
     except Exception:
         pass
@@ -124,8 +164,8 @@ def parse_pagination_inner(text):
     if not text:
         return None
     # remove non-breaking spaces etc
-    txt = text.replace('\xa0', ' ').strip()
-    m = re.search(r"(\d+)\s*to\s*(\d+)\s*of\s*(\d+)", txt, re.IGNORECASE)
+    txt = text.translate(_NBSP_TO_SPACE).strip()
+    m = _PAG_RE.search(txt)
     if m:
         start = int(m.group(1))
         end = int(m.group(2))
@@ -171,45 +211,80 @@ def wait_for_expected_range(driver, expected_start, expected_end, expected_total
     except Exception:
         return False
 
+def wait_for_results_change(driver, old_pag, old_text, old_cards, timeout=RESULTS_WAIT):
+    """
+    Wait until the results seen before a trigger are refreshed: the old
+    pagination_inner element (old_pag) or card container (old_cards) goes stale,
+    or the pagination text differs from old_text; and a pagination_inner or card
+    container is present. old_pag/old_cards are lists of 0 or 1 elements; with
+    neither, only presence is awaited. Returns True on change, False if timed out.
+    """
+    def _stale(els):
+        try:
+            if els:
+                els[0].is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return True
+
+    def _check(_):
+        if old_pag or old_cards:
+            changed = _stale(old_pag) or _stale(old_cards)
+            if not changed and old_pag:
+                try:
+                    changed = old_pag[0].text != old_text
+                except StaleElementReferenceException:
+                    changed = True
+            if not changed:
+                return False
+        return bool(
+            driver.find_elements(By.CSS_SELECTOR, "div.pagination_inner p")
+            or driver.find_elements(By.CSS_SELECTOR, "div.fixed-table-body.card-table")
+        )
+    try:
+        return WebDriverWait(driver, timeout).until(_check)
+    except TimeoutException:
+        return False
+
 def scrape_cards_on_current_view(driver):
+    """Return one tuple per card, in COLUMNS order."""
+    # a single Runtime.evaluate returns [[title, value], ...] per card, so the
+    # whole page costs one round-trip instead of several per field
     rows = []
-    card_containers = driver.find_elements(By.CSS_SELECTOR, "div.fixed-table-body.card-table")
-    for card in card_containers:
+    cards = evaluate_js(driver, CARDS_JS) or []
+    for pairs in cards:
         card_data = {h: "" for h in COLUMNS}
-        try:
-            card_views = card.find_elements(By.CSS_SELECTOR, "div.card-view")
-            for cv in card_views:
-                try:
-                    title_elem = cv.find_element(By.CSS_SELECTOR, "div.title span")
-                    value_elem = cv.find_element(By.CSS_SELECTOR, "div.value span")
-                    title = title_elem.text.strip()
-                    value = value_elem.text.strip()
-                    key = TITLE_TO_HEADER.get(title, None)
-                    if key:
-                        card_data[key] = value
-                    else:
-                        t_norm = title.strip().rstrip(':').lower()
-                        for k_t, v_t in TITLE_TO_HEADER.items():
-                            if k_t.lower().rstrip(':') == t_norm:
-                                card_data[v_t] = value
-                                break
-                except Exception:
-                    continue
-        except Exception:
-            continue
-        if card_data.get("Name") or card_data.get("Registration No."):
-            rows.append(card_data)
+        for pair in pairs:
+            if not pair:
+                continue
+            title, value = pair
+            key = TITLE_TO_HEADER.get(title, None)
+            if key:
+                card_data[key] = value
+            else:
+                t_norm = title.strip().rstrip(':').lower()
+                for k_t, v_t in TITLE_TO_HEADER.items():
+                    if k_t.lower().rstrip(':') == t_norm:
+                        card_data[v_t] = value
+                        break
+        if card_data["Name"] or card_data["Registration No."]:
+            rows.append(tuple(card_data[c] for c in COLUMNS))
     return rows
 
 def scrape_letter_with_pagination(driver, letter_id):
     collected = []
+    old_pag = driver.find_elements(By.CSS_SELECTOR, "div.pagination_inner p")[:1]
+    old_text = old_pag[0].text if old_pag else ""
+    old_cards = driver.find_elements(By.CSS_SELECTOR, "div.fixed-table-body.card-table")[:1]
     ok = trigger_letter(driver, letter_id)
     if not ok:
         print(f"[WARN] couldn't trigger letter {letter_id}")
         return collected
 
-    # Give JS time to load initial results
-    time.sleep(CLICK_DELAY)
+    # wait for the letter's results instead of a fixed delay; an in-place update
+    # with identical text or an empty letter shows no change, so only wait briefly
+    if not wait_for_results_change(driver, old_pag, old_text, old_cards):
+        print(f"[INFO] letter {letter_id}: no visible refresh within {RESULTS_WAIT}s, reading current view")
 
     # determine total records and per_page from pagination_inner
     total_records, per_page = get_total_records_and_perpage(driver)
@@ -225,8 +300,6 @@ def scrape_letter_with_pagination(driver, letter_id):
             okp = trigger_page_zero_based(driver, zero_idx)
             if not okp:
                 print(f"[WARN] could not trigger page {page_num} (zero_idx={zero_idx}) for {letter_id}, attempting to continue")
-            # small wait for JS to kick in
-            time.sleep(CLICK_DELAY)
 
         # compute expected start/end for waiting/validation
         expected_start = (page_num - 1) * per_page + 1
@@ -252,7 +325,7 @@ def scrape_letter_with_pagination(driver, letter_id):
 
 def main():
     letters = ["A1"] + [chr(c) for c in range(ord('A'), ord('Z') + 1)]
-    driver = make_driver(headless=HEADLESS)
+    driver = make_driver(headless=HEADLESS, debug_port=DEBUG_PORT)
     try:
         driver.get(START_URL)
         wait = WebDriverWait(driver, WAIT_TIMEOUT)
@@ -268,16 +341,13 @@ def main():
                 continue
 
         if not all_rows:
-            print("[WARN] No rows scraped. Try HEADLESS=False (if not), increase CLICK_DELAY/WAIT_TIMEOUT and re-run.")
+            print("[WARN] No rows scraped. Try HEADLESS=False (if not), increase WAIT_TIMEOUT and re-run.")
             return
 
-        df = pd.DataFrame(all_rows)
-        for col in COLUMNS:
-            if col not in df.columns:
-                df[col] = ""
-        df = df[COLUMNS]
+        df = pd.DataFrame.from_records(all_rows, columns=COLUMNS)
         df = df.drop_duplicates().reset_index(drop=True)
-        df.to_excel(OUTPUT_XLSX, index=False)
+        with pd.ExcelWriter(OUTPUT_XLSX, engine="xlsxwriter") as writer:
+            df.to_excel(writer, index=False)
         print(f"[OK] Saved {len(df)} rows to {OUTPUT_XLSX}")
 
     finally: